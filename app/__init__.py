@@ -16,8 +16,60 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///dev.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # Background workers for precomputed item summaries; 0 runs them inline.
+    # In-memory SQLite has a single shared connection, so never use threads there.
+    default_workers = '0' if app.config['SQLALCHEMY_DATABASE_URI'].endswith(':memory:') else '2'
+    app.config['SUMMARY_WORKERS'] = int(os.getenv('SUMMARY_WORKERS', default_workers))
+    # Upper bound on rows kept in the chunk summary store (least recently used evicted)
+    app.config['CHUNK_STORE_MAX_ENTRIES'] = int(os.getenv('CHUNK_STORE_MAX_ENTRIES', '10000'))
+    # Admission control for the ML blueprint (see app.ml.admission)
+    app.config['ML_ADMISSION_ENABLED'] = os.getenv('ML_ADMISSION_ENABLED', '1') == '1'
+    app.config['ML_ADMISSION_DB'] = os.getenv(
+        'ML_ADMISSION_DB', os.path.join(app.instance_path, 'ml_admission.db')
+    )
+    app.config['ML_RATE_PER_SEC'] = float(os.getenv('ML_RATE_PER_SEC', '5'))
+    app.config['ML_RATE_BURST'] = int(os.getenv('ML_RATE_BURST', '20'))
+    app.config['ML_MAX_CONCURRENCY'] = int(os.getenv('ML_MAX_CONCURRENCY', '32'))
+    app.config['ML_QUEUE_DEADLINE'] = float(os.getenv('ML_QUEUE_DEADLINE', '5'))
+    app.config['ML_DEGRADE_TO_LOCAL'] = os.getenv('ML_DEGRADE_TO_LOCAL', '0') == '1'
+    # Number of reverse proxies in front of the app whose X-Forwarded-For can be trusted
+    app.config['ML_TRUSTED_PROXIES'] = int(os.getenv('ML_TRUSTED_PROXIES', '0'))
+    # Opt-in per-request profiling (see app.profiling)
+    app.config['PROFILING_ENABLED'] = os.getenv('PROFILING_ENABLED', '0') == '1'
+    app.config['PROFILING_MODE'] = os.getenv('PROFILING_MODE', 'cprofile')  # or 'sample'
+    app.config['PROFILING_HEADER'] = os.getenv('PROFILING_HEADER', 'X-Profile')
+    app.config['PROFILING_TOKEN'] = os.getenv('PROFILING_TOKEN')
+    app.config['PROFILING_SAMPLE_RATE'] = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+    app.config['PROFILING_INTERVAL'] = float(os.getenv('PROFILING_INTERVAL', '0.005'))
+    app.config['PROFILING_DIR'] = os.getenv('PROFILING_DIR', os.path.join(app.instance_path, 'profiles'))
+    app.config['PROFILING_MAX_FILES'] = int(os.getenv('PROFILING_MAX_FILES', '500'))
+
     db.init_app(app)
 
+    from .ml.summaries import SummaryWorker, register_session_hooks
+
+    register_session_hooks()
+    SummaryWorker(app, max_workers=app.config['SUMMARY_WORKERS'])
+
+    if app.config['ML_ADMISSION_ENABLED']:
+        from .ml.admission import Admission
+
+        app.extensions['ml_admission'] = Admission(
+            app.config['ML_ADMISSION_DB'],
+            rate=app.config['ML_RATE_PER_SEC'],
+            burst=app.config['ML_RATE_BURST'],
+            max_concurrency=app.config['ML_MAX_CONCURRENCY'],
+            deadline=app.config['ML_QUEUE_DEADLINE'],
+        )
+
+    from .profiling import init_profiling
+
+    init_profiling(app)
+
+    from .cli import register_commands
+
+    register_commands(app)
+
     # Blueprints
     from .routes.health import bp as health_bp
     from .routes.items import bp as items_bp
@@ -27,8 +79,10 @@ def create_app():
     app.register_blueprint(items_bp, url_prefix='/api/v1/items')
     app.register_blueprint(ml_bp, url_prefix='/api/v1/ml')
 
-    # Create DB tables if needed (simple)
+    # Create DB tables if needed (simple), and add columns new models gained
+    from .models import create_schema
+
     with app.app_context():
-        db.create_all()
+        create_schema(db.engine)
 
     return app
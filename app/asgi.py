@@ -0,0 +1,148 @@
+"""ASGI serving path for the ML endpoints.
+
+`POST /api/v1/ml/summarize` is handled natively on the event loop with
+`summarize_text_async`, so a slow upstream call costs a coroutine rather
+than a whole worker process. Every other request -- including chunked
+summaries, which need the database -- is passed to the regular Flask app
+through `asgiref`'s WSGI adapter and behaves exactly as under gunicorn.
+The native path bypasses Flask's request hooks, so it is not covered by
+`app.profiling`.
+
+Served by `asgi.py` at the repository root, e.g.
+`gunicorn -k uvicorn.workers.UvicornWorker asgi:app`.
+"""
+import asyncio
+import json
+import time
+
+from asgiref.wsgi import WsgiToAsgi
+
+from .ml.admission import Rejected, client_id
+from .ml.integration import summarize_text_async
+
+
+SUMMARIZE_PATH = "/api/v1/ml/summarize"
+
+
+class AsyncMLApp:
+    """ASGI app that serves summarize natively and delegates the rest to Flask."""
+
+    def __init__(self, flask_app, max_connections: int = 1000):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.max_connections = max_connections
+        self.http = None  # shared httpx.AsyncClient, created on first use
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http" or scope["path"].rstrip("/") != SUMMARIZE_PATH or scope["method"] != "POST":
+            return await self.wsgi(scope, receive, send)
+
+        body = await _read_body(receive)
+        try:
+            data = json.loads(body or b"{}") or {}
+        except ValueError:
+            data = {}
+        if data.get("chunked"):
+            # needs a database session: hand the already-read body to Flask
+            return await self.wsgi(scope, _replay(body), send)
+        await self._summarize(scope, data, send)
+
+    async def _summarize(self, scope, data, send):
+        # Same admission rules as the Flask blueprint (see app.routes.ml.admit)
+        admission = self.flask_app.extensions.get("ml_admission")
+        slot = None
+        api_key = None
+        if admission is not None:
+            headers = dict(scope.get("headers") or [])
+            forwarded = headers.get(b"x-forwarded-for", b"").decode("latin-1")
+            client = client_id(
+                (scope.get("client") or (None,))[0], forwarded, self.flask_app.config["ML_TRUSTED_PROXIES"]
+            )
+            try:
+                slot = await admission.acquire_async(client)
+            except Rejected as e:
+                if e.status != 503 or not self.flask_app.config["ML_DEGRADE_TO_LOCAL"]:
+                    return await _send_json(
+                        send, e.status, {"error": e.reason}, [(b"retry-after", str(e.retry_after).encode())]
+                    )
+                api_key = False
+
+        started = time.monotonic()
+        try:
+            text = data.get("text", "")
+            if not text:
+                return await _send_json(send, 400, {"error": "text required"})
+            try:
+                result = await summarize_text_async(text, api_key=api_key, client=self._client())
+                await _send_json(send, 200, {"summary": result})
+            except Exception as e:
+                await _send_json(send, 500, {"error": str(e)})
+        finally:
+            if slot is not None:
+                await asyncio.to_thread(admission.release, slot, time.monotonic() - started)
+
+    def _client(self):
+        if self.http is None:
+            import httpx
+
+            self.http = httpx.AsyncClient(
+                timeout=60, limits=httpx.Limits(max_connections=self.max_connections)
+            )
+        return self.http
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.http is not None:
+                    await self.http.aclose()
+                    self.http = None
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app(flask_app, max_connections: int = 1000) -> AsyncMLApp:
+    return AsyncMLApp(flask_app, max_connections=max_connections)
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    more = True
+    while more:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+def _replay(body: bytes):
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+async def _send_json(send, status: int, payload, headers=()) -> None:
+    data = json.dumps(payload).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(data)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": data})
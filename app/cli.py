@@ -0,0 +1,65 @@
+"""Flask CLI commands (`flask --app run.py <command>`)."""
+import click
+from flask.cli import with_appcontext
+
+from .extensions import db
+
+
+@click.command("backfill-summaries")
+@click.option("--batch-size", default=100, show_default=True, help="Rows read and committed per batch.")
+@click.option("--concurrency", default=4, show_default=True, help="Summaries computed in parallel.")
+@with_appcontext
+def backfill_summaries_command(batch_size: int, concurrency: int):
+    """Fill in missing or stale item summaries."""
+    from .ml.summaries import backfill_summaries
+
+    stats = backfill_summaries(db.session, batch_size=batch_size, concurrency=concurrency)
+    click.echo(
+        f"scanned {stats['scanned']} items: {stats['updated']} summarized, "
+        f"{stats['skipped']} already up to date, {stats['failed']} failed (re-run to retry)"
+    )
+
+
+@click.command("export-items")
+@click.option("--format", "fmt", type=click.Choice(["ndjson", "csv"]), default="ndjson", show_default=True)
+@click.option("--gzip", is_flag=True, help="Gzip the output.")
+@click.option("--after-id", default=0, show_default=True, help="Only export items with a larger id (to resume).")
+@click.option("--batch-size", default=1000, show_default=True, help="Rows fetched per round trip.")
+@click.option("--output", "-o", type=click.File("wb"), default="-", help="Output file (default: stdout).")
+@with_appcontext
+def export_items_command(fmt: str, gzip: bool, after_id: int, batch_size: int, output):
+    """Stream all items to a file as NDJSON or CSV."""
+    from .export import export_items
+
+    for chunk in export_items(db.session, fmt=fmt, gzip=gzip, after_id=after_id, batch_size=batch_size):
+        output.write(chunk)
+
+
+@click.command("profiles-report")
+@click.option("--top", default=10, show_default=True, help="Routes to show.")
+@click.option("--functions", default=5, show_default=True, help="Most expensive functions per route (cProfile only).")
+@click.option("--dir", "directory", default=None, help="Profile directory (default: PROFILING_DIR).")
+@with_appcontext
+def profiles_report_command(top: int, functions: int, directory: str | None):
+    """Show the routes that spent the most time in profiled requests."""
+    from flask import current_app
+
+    from .profiling import profile_report
+
+    report = profile_report(directory or current_app.config["PROFILING_DIR"], top=top, functions=functions)
+    if not report:
+        click.echo("no profiles recorded")
+        return
+    for entry in report:
+        click.echo(
+            f"{entry['route']}: {entry['count']} requests, total {entry['total_ms']:.1f} ms, "
+            f"mean {entry['mean_ms']:.1f} ms, p95 {entry['p95_ms']:.1f} ms, max {entry['max_ms']:.1f} ms"
+        )
+        for fn in entry["functions"]:
+            click.echo(f"    {fn['cumulative_ms']:10.1f} ms  {fn['calls']:>8} calls  {fn['function']}")
+
+
+def register_commands(app):
+    app.cli.add_command(backfill_summaries_command)
+    app.cli.add_command(export_items_command)
+    app.cli.add_command(profiles_report_command)
@@ -0,0 +1,87 @@
+"""Streaming bulk export of the items table.
+
+Rows are read with a server-side cursor (`stream_results`) in batches of
+`yield_per`, encoded one at a time as NDJSON or CSV and optionally gzipped
+on the fly, so memory use does not grow with the size of the table. Rows
+come out in id order; an interrupted export resumes with `after_id` set to
+the last id received.
+"""
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator
+
+from sqlalchemy import select
+
+from .models import Item
+
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_COLUMNS = ["id", "name", "description", "summary", "created_at", "updated_at"]
+
+# flush encoded output in pieces of about this many bytes
+_CHUNK_SIZE = 64 * 1024
+
+
+def iter_items(session, after_id: int = 0, batch_size: int = 1000) -> Iterator[dict]:
+    stmt = (
+        select(Item)
+        .where(Item.id > after_id)
+        .order_by(Item.id)
+        .execution_options(yield_per=batch_size, stream_results=True)
+    )
+    for item in session.scalars(stmt):
+        yield item.to_dict()
+
+
+def encode_ndjson(rows: Iterable[dict]) -> Iterator[bytes]:
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def encode_csv(rows: Iterable[dict]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def _coalesce(chunks: Iterable[bytes], size: int = _CHUNK_SIZE) -> Iterator[bytes]:
+    pending = []
+    pending_len = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_len += len(chunk)
+        if pending_len >= size:
+            yield b"".join(pending)
+            pending, pending_len = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+def export_items(session, fmt: str = "ndjson", gzip: bool = False, after_id: int = 0,
+                 batch_size: int = 1000) -> Iterator[bytes]:
+    """Yield the encoded export of all items with id > `after_id`."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported export format {fmt!r} (choose from {', '.join(FORMATS)})")
+    rows = iter_items(session, after_id=after_id, batch_size=batch_size)
+    encoded = encode_ndjson(rows) if fmt == "ndjson" else encode_csv(rows)
+    if gzip:
+        return _coalesce(gzip_stream(encoded))
+    return _coalesce(encoded)
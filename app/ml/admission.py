@@ -0,0 +1,290 @@
+"""Admission control for the ML endpoints.
+
+Two limits are enforced before a summarize request reaches the summarizer:
+
+- a token bucket per client (`rate` requests per second, bursts up to
+  `burst`), answered with 429 when empty;
+- a global cap of `max_concurrency` summaries in flight. Requests over the
+  cap wait for a free slot, but only while the estimated wait (queue depth
+  times the recent average latency) fits in `deadline` seconds; otherwise
+  they get a 503, or are served by the local summarizer when degrading is
+  enabled.
+
+Limiter state lives in a small SQLite file next to the app (not the app
+database, which may be Postgres) so every gunicorn worker on the host sees
+the same buckets and slots. Each check is a single short `BEGIN IMMEDIATE`
+transaction in WAL mode without per-commit fsync.
+"""
+import asyncio
+import math
+import os
+import sqlite3
+import threading
+import time
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (client TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS buckets_updated ON buckets (updated);
+CREATE TABLE IF NOT EXISTS slots (id INTEGER PRIMARY KEY AUTOINCREMENT, pid INTEGER NOT NULL, started REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS waiters (id INTEGER PRIMARY KEY AUTOINCREMENT, started REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS stats (key TEXT PRIMARY KEY, value REAL NOT NULL);
+"""
+
+
+class Rejected(Exception):
+    """Raised when a request is not admitted; `status` is 429 or 503."""
+
+    def __init__(self, status: int, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.reason = reason
+
+
+class Admission:
+    """Token buckets and concurrency slots shared through one SQLite file.
+
+    An admitted request costs two short write transactions: `acquire` (token
+    and slot together) and `release`. Waiters poll with plain reads, sleeping
+    about as long as their estimated wait (between `poll_interval` and
+    `max_poll_interval`), and only take a write transaction once a slot looks
+    free. Slots not released or refreshed within `slot_ttl` seconds are
+    treated as leaked by a dead worker; requests that can run longer than
+    that (chunked summaries) call `refresh` as they make progress.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        rate: float = 5.0,
+        burst: int = 20,
+        max_concurrency: int = 32,
+        deadline: float = 5.0,
+        slot_ttl: float = 120.0,
+        poll_interval: float = 0.05,
+        max_poll_interval: float = 0.5,
+    ):
+        if rate <= 0 or burst < 1:
+            raise ValueError("ML_RATE_PER_SEC must be > 0 and ML_RATE_BURST >= 1")
+        if max_concurrency < 1:
+            raise ValueError("ML_MAX_CONCURRENCY must be >= 1")
+        if deadline < 0:
+            raise ValueError("ML_QUEUE_DEADLINE must be >= 0")
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+        self.slot_ttl = slot_ttl
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max(poll_interval, max_poll_interval)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _open(self):
+        # one connection per thread (reopened after a fork): connecting costs far more than a check
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            # WAL + NORMAL: commits don't fsync; a power loss can only lose limiter state
+            local.conn.execute("PRAGMA synchronous=NORMAL")
+            local.pid = os.getpid()
+        return local.conn
+
+    def _connect(self):
+        return _Transaction(self._open())
+
+    # -- per-client token bucket -------------------------------------------------
+
+    def take_token(self, client: str) -> None:
+        """Consume one token for `client` or raise `Rejected` (429)."""
+        with self._connect() as conn:
+            wait = self._take_token(conn, client, time.time())
+        if wait is not None:
+            raise Rejected(429, wait, "rate limit exceeded")
+
+    def _take_token(self, conn, client: str, now: float) -> float | None:
+        """Returns None when a token was taken, else the seconds until one is available."""
+        # A bucket untouched long enough to refill completely is the same as no row.
+        conn.execute("DELETE FROM buckets WHERE updated < ?", (now - self.burst / self.rate,))
+        row = conn.execute("SELECT tokens, updated FROM buckets WHERE client = ?", (client,)).fetchone()
+        tokens = self.burst if row is None else min(self.burst, row[0] + (now - row[1]) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        conn.execute("INSERT OR REPLACE INTO buckets (client, tokens, updated) VALUES (?, ?, ?)", (client, tokens, now))
+        return None if allowed else (1 - tokens) / self.rate
+
+    # -- global concurrency cap ----------------------------------------------------
+
+    def try_acquire(self, waiter: int | None = None):
+        """Take a slot if one is free.
+
+        Returns `(slot_id, None)` on success, else `(None, estimated_wait)`.
+        `waiter` is the caller's row in the wait queue, if it has one.
+        """
+        with self._connect() as conn:
+            return self._try_acquire(conn, time.time(), waiter)
+
+    def _try_acquire(self, conn, now: float, waiter: int | None):
+        conn.execute("DELETE FROM slots WHERE started < ?", (now - self.slot_ttl,))
+        conn.execute("DELETE FROM waiters WHERE started < ?", (now - 2 * self.deadline,))
+        in_flight = conn.execute("SELECT COUNT(*) FROM slots").fetchone()[0]
+        if in_flight < self.max_concurrency:
+            cur = conn.execute("INSERT INTO slots (pid, started) VALUES (?, ?)", (os.getpid(), now))
+            if waiter is not None:
+                conn.execute("DELETE FROM waiters WHERE id = ?", (waiter,))
+            return cur.lastrowid, None
+        return None, self._estimate(conn, in_flight, waiter)
+
+    def _estimate(self, conn, in_flight: int, waiter: int | None) -> float:
+        # queue position: waiters ahead of us, or all of them plus us when not queued yet
+        if waiter is None:
+            position = conn.execute("SELECT COUNT(*) FROM waiters").fetchone()[0] + 1
+        else:
+            position = conn.execute("SELECT COUNT(*) FROM waiters WHERE id <= ?", (waiter,)).fetchone()[0]
+        latency = self._stat(conn, "latency", 1.0)
+        return (in_flight - self.max_concurrency + position) / self.max_concurrency * latency
+
+    def _peek(self, waiter: int) -> float | None:
+        """Read-only check for waiters: None if a slot looks free, else the estimated wait."""
+        conn = self._open()
+        in_flight = conn.execute(
+            "SELECT COUNT(*) FROM slots WHERE started >= ?", (time.time() - self.slot_ttl,)
+        ).fetchone()[0]
+        if in_flight < self.max_concurrency:
+            return None
+        return self._estimate(conn, in_flight, waiter)
+
+    def _first_try(self, client: str | None):
+        # token and first slot attempt share one transaction
+        now = time.time()
+        with self._connect() as conn:
+            wait = None if client is None else self._take_token(conn, client, now)
+            if wait is None:
+                return self._try_acquire(conn, now, None)
+        raise Rejected(429, wait, "rate limit exceeded")
+
+    def _admit(self, estimate: float, started: float) -> float:
+        """Decide whether to keep waiting; returns the time left before the deadline."""
+        remaining = self.deadline - (time.monotonic() - started)
+        if estimate > remaining or remaining <= 0:
+            raise Rejected(503, estimate, "summarizer overloaded")
+        return remaining
+
+    def _poll(self, waiter: int, started: float):
+        """One waiting step: returns `(slot, None)` or `(None, seconds to sleep before the next one)`."""
+        estimate = self._peek(waiter)
+        if estimate is None:
+            slot, estimate = self.try_acquire(waiter)
+            if slot is not None:
+                return slot, None
+        remaining = self._admit(estimate, started)
+        # sleep about as long as our turn is expected to take, within bounds
+        return None, min(max(estimate, self.poll_interval), self.max_poll_interval, remaining)
+
+    def acquire(self, client: str | None = None) -> int:
+        """Take a token for `client` (if given) and wait for a slot.
+
+        Raises `Rejected`: 429 when the client is over its rate, 503 when no
+        slot can come within the deadline.
+        """
+        slot, estimate = self._first_try(client)
+        if slot is not None:
+            return slot
+        started = time.monotonic()
+        self._admit(estimate, started)
+        waiter = self._enqueue()
+        delay = self.poll_interval
+        try:
+            while True:
+                time.sleep(delay)
+                slot, delay = self._poll(waiter, started)
+                if slot is not None:
+                    return slot
+        except BaseException:
+            self._dequeue(waiter)
+            raise
+
+    async def acquire_async(self, client: str | None = None) -> int:
+        """`acquire` for the event loop: waits with `asyncio.sleep`."""
+        slot, estimate = await asyncio.to_thread(self._first_try, client)
+        if slot is not None:
+            return slot
+        started = time.monotonic()
+        self._admit(estimate, started)
+        waiter = await asyncio.to_thread(self._enqueue)
+        delay = self.poll_interval
+        try:
+            while True:
+                await asyncio.sleep(delay)
+                slot, delay = await asyncio.to_thread(self._poll, waiter, started)
+                if slot is not None:
+                    return slot
+        except BaseException:
+            await asyncio.to_thread(self._dequeue, waiter)
+            raise
+
+    def refresh(self, slot: int) -> None:
+        """Mark `slot` as still in use so it isn't reaped after `slot_ttl`."""
+        with self._connect() as conn:
+            conn.execute("UPDATE slots SET started = ? WHERE id = ?", (time.time(), slot))
+
+    def release(self, slot: int, elapsed: float | None = None) -> None:
+        """Free `slot`; `elapsed` feeds the average latency used for wait estimates."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM slots WHERE id = ?", (slot,))
+            if elapsed is not None:
+                latency = self._stat(conn, "latency", elapsed)
+                conn.execute(
+                    "INSERT OR REPLACE INTO stats (key, value) VALUES ('latency', ?)", (0.8 * latency + 0.2 * elapsed,)
+                )
+
+    def _enqueue(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("INSERT INTO waiters (started) VALUES (?)", (time.time(),)).lastrowid
+
+    def _dequeue(self, waiter: int) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM waiters WHERE id = ?", (waiter,))
+
+    @staticmethod
+    def _stat(conn, key, default):
+        row = conn.execute("SELECT value FROM stats WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+
+class _Transaction:
+    """`with` block running one `BEGIN IMMEDIATE` transaction on `conn`."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def client_id(remote_addr: str | None, forwarded_for: str | None, trusted_proxies: int = 0) -> str:
+    """Key used for the per-client bucket.
+
+    The peer address, unless the app runs behind `trusted_proxies` proxies
+    (`ML_TRUSTED_PROXIES`): then the X-Forwarded-For hop the outermost
+    trusted proxy added, like werkzeug's `ProxyFix(x_for=trusted_proxies)`.
+    Hops further left are client-controlled and never used.
+    """
+    if trusted_proxies > 0 and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        if len(hops) >= trusted_proxies:
+            return hops[-trusted_proxies]
+    return remote_addr or "unknown"
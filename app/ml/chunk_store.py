@@ -0,0 +1,187 @@
+"""Chunk-level summary store shared across documents.
+
+Long documents are summarized chunk by chunk. Each upstream chunk summary is
+stored in the `chunk_summaries` table under the sha256 of the model name and
+the chunk text, so a chunk that shows up again -- in an overlapping window,
+or in a re-uploaded copy of the same file -- is summarized upstream only
+once. Local heuristic and failed-call summaries are never stored.
+
+With fixed-size windows a single inserted character shifts every later
+chunk. `content_defined_bounds` instead cuts where a rolling hash of the text
+matches a bit mask, so boundaries move with the content and an edit only
+changes the chunks around it.
+"""
+import hashlib
+import random
+from datetime import datetime
+from typing import Callable, Iterator, List, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from ..models import ChunkSummary
+from .integration import MODEL, summarize_text_with_source
+
+
+_MASK64 = (1 << 64) - 1
+# Fixed seed: boundaries must be identical across processes and restarts.
+_gear_rng = random.Random(0x5EED)
+_GEAR = [_gear_rng.getrandbits(64) for _ in range(256)]
+del _gear_rng
+
+
+def chunk_hash(text: str, model: str = MODEL) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def content_defined_bounds(
+    text: str, avg_size: int = 1000, min_size: int | None = None, max_size: int | None = None
+) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) chunk offsets cut by a gear rolling hash.
+
+    A boundary is placed after a character where the top bits of the hash
+    are all zero, which happens on average every `avg_size` characters;
+    chunks are kept between `min_size` and `max_size` characters.
+    """
+    min_size = min_size or avg_size // 4
+    max_size = max_size or avg_size * 4
+    bits = max(1, avg_size.bit_length() - 1)
+    mask = ((1 << bits) - 1) << (64 - bits)
+
+    length = len(text)
+    start = 0
+    while start < length:
+        end = min(start + max_size, length)
+        h = 0
+        i = start
+        # Characters before min_size can't end a chunk, but still feed the hash.
+        while i < end:
+            h = ((h << 1) + _GEAR[ord(text[i]) & 0xFF]) & _MASK64
+            i += 1
+            if i - start >= min_size and not h & mask:
+                break
+        yield start, i
+        start = i
+
+
+class ChunkStore:
+    """Chunk summaries persisted in the app database.
+
+    The table is capped at `max_entries` rows; `evict` drops the least
+    recently used ones.
+    """
+
+    def __init__(self, session, max_entries: int = 10_000):
+        self.session = session
+        self.max_entries = max_entries
+
+    def get_many(self, hashes: List[str], touch: bool = True) -> dict:
+        """Return `{hash: summary}` for the stored hashes; `touch` counts the hit for LRU eviction."""
+        if not hashes:
+            return {}
+        rows = self.session.execute(select(ChunkSummary).where(ChunkSummary.hash.in_(hashes))).scalars()
+        now = datetime.utcnow()
+        found = {}
+        for row in rows:
+            if touch:
+                row.hits += 1
+                row.last_used_at = now
+            found[row.hash] = row.summary
+        return found
+
+    def put(self, digest: str, summary: str, size: int) -> None:
+        """Store a summary; a concurrent request that stored the same chunk first wins."""
+        values = {"hash": digest, "summary": summary, "size": size, "hits": 0, "last_used_at": datetime.utcnow()}
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "sqlite":
+            stmt = sqlite.insert(ChunkSummary).values(**values).on_conflict_do_nothing(index_elements=["hash"])
+        elif dialect == "postgresql":
+            stmt = postgresql.insert(ChunkSummary).values(**values).on_conflict_do_nothing(index_elements=["hash"])
+        else:
+            self.session.merge(ChunkSummary(**values))
+            return
+        self.session.execute(stmt)
+
+    def evict(self) -> int:
+        """Delete least recently used rows above `max_entries`; returns how many."""
+        self.session.flush()
+        excess = self.session.scalar(select(func.count()).select_from(ChunkSummary)) - self.max_entries
+        if excess <= 0:
+            return 0
+        oldest = select(ChunkSummary.hash).order_by(ChunkSummary.last_used_at).limit(excess)
+        self.session.execute(
+            delete(ChunkSummary).where(ChunkSummary.hash.in_(oldest)), execution_options={"synchronize_session": False}
+        )
+        return excess
+
+
+def split_chunks(
+    text: str, chunk_size: int = 1000, chunk_overlap: int = 200, content_defined: bool = False
+) -> List[str]:
+    if content_defined:
+        text = text.strip()
+        return [text[start:end] for start, end in content_defined_bounds(text, avg_size=chunk_size)]
+    return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap).split_text(text)
+
+
+def summarize_document(
+    text: str,
+    store: ChunkStore,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    content_defined: bool = False,
+    api_key: str | None | bool = None,
+    read_only: bool = False,
+    on_chunk: Callable[[], None] | None = None,
+) -> Tuple[str, dict]:
+    """Summarize `text` chunk by chunk, reusing stored chunk summaries.
+
+    Only successful upstream summaries are stored. With `read_only` (e.g. when
+    degraded to the local summarizer) the store is only read: nothing is
+    stored, hits aren't counted and nothing is committed. `on_chunk` is
+    called after each chunk that had to be summarized.
+
+    Returns the summary and per-document stats: chunk counts, chunks served
+    from the store, upstream calls made and saved, chunks summarized locally,
+    and the dedup ratio (share of chunks served from the store or repeated
+    within the document). All counts are per chunk, repeats included.
+    """
+    chunks = split_chunks(text, chunk_size, chunk_overlap, content_defined)
+    hashes = [chunk_hash(chunk) for chunk in chunks]
+    known = store.get_many(list(set(hashes)), touch=not read_only)
+    cached = sum(digest in known for digest in hashes)
+
+    upstream_calls = 0
+    local = 0
+    summaries = []
+    for digest, chunk in zip(hashes, chunks):
+        if digest not in known:
+            summary, source = summarize_text_with_source(chunk, api_key=api_key)
+            known[digest] = summary
+            if source == "local":
+                local += 1
+            else:
+                upstream_calls += 1
+            # Only real upstream summaries are worth serving to later requests.
+            if source == "openai" and not read_only:
+                store.put(digest, summary, len(chunk))
+            if on_chunk is not None:
+                on_chunk()
+        summaries.append(known[digest])
+    if not read_only:
+        store.evict()
+        store.session.commit()
+
+    saved = len(chunks) - upstream_calls - local
+    stats = {
+        "chunks": len(chunks),
+        "unique_chunks": len(set(hashes)),
+        "cached_chunks": cached,
+        "upstream_calls": upstream_calls,
+        "local_summaries": local,
+        "upstream_calls_saved": saved,
+        "dedup_ratio": round(saved / len(chunks), 4) if chunks else 0.0,
+    }
+    return " ".join(summaries), stats
@@ -5,6 +5,34 @@ import os
 # If OPENAI_API_KEY is set (or provided to the function), attempts to call OpenAI.
 # Otherwise returns a mock summary.
 
+MODEL = "gpt-4o-mini"
+
+
+def _resolve_key(api_key):
+    # If caller passes False explicitly, treat as 'do not use API' (force local heuristic)
+    if api_key is False:
+        return None
+    return api_key or os.getenv("OPENAI_API_KEY")
+
+
+def _messages(text: str) -> list:
+    return [
+        {
+            "role": "user",
+            "content": f"Summarize the following text in 2-3 sentences:\n\n{text}",
+        }
+    ]
+
+
+def _local_summary(text: str) -> str:
+    # Mock summarization (simple heuristic)
+    sentences = text.strip().split('.')
+    if len(sentences) <= 2:
+        return text if len(text) < 300 else text[:300]
+
+    # return first two sentences as a naive summary
+    return ".".join(sentences[:2]).strip() + "."
+
 
 def summarize_text(text: str, api_key: str | None | bool = None) -> str:
     """Summarize `text`.
@@ -17,14 +45,19 @@ def summarize_text(text: str, api_key: str | None | bool = None) -> str:
     Returns a short summary string. Falls back to a naive heuristic if no API key
     is available or the API call fails.
     """
+    return summarize_text_with_source(text, api_key)[0]
+
+
+def summarize_text_with_source(text: str, api_key: str | None | bool = None) -> tuple[str, str]:
+    """Like `summarize_text`, but also say where the summary came from.
+
+    The source is "openai" for a successful upstream call, "fallback" when the
+    upstream call failed, and "local" when no API key was used.
+    """
     if not text:
-        return ""
+        return "", "local"
 
-    # If caller passes False explicitly, treat as 'do not use API' (force local heuristic)
-    if api_key is False:
-        key = None
-    else:
-        key = api_key or os.getenv("OPENAI_API_KEY")
+    key = _resolve_key(api_key)
 
     if key:
         try:
@@ -33,27 +66,51 @@ def summarize_text(text: str, api_key: str | None | bool = None) -> str:
             openai.api_key = key
             # Use the Chat Completions if available (model name may change)
             response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"Summarize the following text in 2-3 sentences:\n\n{text}",
-                    }
-                ],
+                model=MODEL,
+                messages=_messages(text),
                 max_tokens=150,
                 temperature=0.2,
             )
 
             # extract text
-            return response.choices[0].message.content.strip()
+            return response.choices[0].message.content.strip(), "openai"
         except Exception:
             # If real API fails, fallback to mock
-            return f"(openai-fallback) {text[:200]}"
+            return f"(openai-fallback) {text[:200]}", "fallback"
 
-    # Mock summarization (simple heuristic)
-    sentences = text.strip().split('.')
-    if len(sentences) <= 2:
-        return text if len(text) < 300 else text[:300]
+    return _local_summary(text), "local"
 
-    # return first two sentences as a naive summary
-    return ".".join(sentences[:2]).strip() + "."
+
+async def summarize_text_async(text: str, api_key: str | None | bool = None, client=None) -> str:
+    """Async variant of `summarize_text` for the ASGI serving path.
+
+    Talks to the Chat Completions HTTP API directly through `client` (an
+    `httpx.AsyncClient`, created per call if omitted) so that many in-flight
+    summaries share one event loop instead of each blocking a worker. Falls
+    back exactly like `summarize_text`.
+    """
+    if not text:
+        return ""
+
+    key = _resolve_key(api_key)
+    if not key:
+        return _local_summary(text)
+
+    import httpx
+
+    api_base = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1").rstrip("/")
+    payload = {"model": MODEL, "messages": _messages(text), "max_tokens": 150, "temperature": 0.2}
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient(timeout=60)
+    try:
+        response = await client.post(
+            f"{api_base}/chat/completions", json=payload, headers={"Authorization": f"Bearer {key}"}
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
+    except Exception:
+        return f"(openai-fallback) {text[:200]}"
+    finally:
+        if owns_client:
+            await client.aclose()
@@ -0,0 +1,218 @@
+"""Precomputed summaries for `Item.description`.
+
+Items are summarized once, in the background, instead of every reader posting
+the description to `/api/v1/ml/summarize`. Any commit that creates an item or
+changes its description enqueues that item on the app's `SummaryWorker`; the
+worker skips items whose `summary_hash` already matches the description.
+`backfill_summaries` does the same for existing rows, batch by batch.
+
+When the upstream call fails, the item is left without a summary or hash
+instead of storing the fallback text, so the next backfill retries it.
+"""
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Lock
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import Item
+from .integration import summarize_text_with_source
+
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "pending_item_summaries"
+
+
+def description_hash(description: str | None) -> str | None:
+    """Return the content hash stored in `Item.summary_hash` for `description`."""
+    if not description:
+        return None
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+def _summarize(description: str | None, digest: str | None) -> tuple[str | None, str | None]:
+    """Return the `(summary, summary_hash)` to store for `description`."""
+    if not description:
+        return None, digest
+    summary, source = summarize_text_with_source(description)
+    if source == "fallback":
+        return None, None
+    return summary, digest
+
+
+def _store_summary(
+    session: Session, item_id: int, description: str | None, digest: str | None, summary: str | None
+) -> bool:
+    """Write `summary` unless the item's description changed since it was read.
+
+    A stale result is dropped: the edit that changed the description has
+    enqueued its own refresh. Returns True when the row was updated.
+    """
+    current = Item.description.is_(None) if description is None else Item.description == description
+    # Derived data: keep `updated_at` pointing at the last user edit.
+    result = session.execute(
+        update(Item)
+        .where(Item.id == item_id, current)
+        .values(summary=summary, summary_hash=digest, updated_at=Item.updated_at)
+    )
+    return result.rowcount > 0
+
+
+def refresh_item_summary(session: Session, item_id: int) -> bool:
+    """Recompute the summary of one item if its description changed.
+
+    Returns True when a new summary was written.
+    """
+    row = session.execute(
+        select(Item.description, Item.summary_hash).where(Item.id == item_id)
+    ).first()
+    if row is None:
+        return False
+
+    digest = description_hash(row.description)
+    if digest == row.summary_hash:
+        return False
+
+    summary, stored_hash = _summarize(row.description, digest)
+    stored = _store_summary(session, item_id, row.description, stored_hash, summary)
+    session.commit()
+    return stored
+
+
+class SummaryWorker:
+    """Runs `refresh_item_summary` off the request path.
+
+    With `max_workers=0` the refresh runs inline right after the commit that
+    triggered it; this is used for in-memory SQLite, whose single connection
+    can't safely be shared with a background thread.
+    """
+
+    def __init__(self, app=None, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._executor = None
+        self._futures = set()
+        self._lock = Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        if self.max_workers > 0:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="item-summary"
+            )
+        app.extensions["summary_worker"] = self
+
+    def enqueue(self, item_id: int) -> None:
+        if self._executor is None:
+            self._run(item_id)
+            return
+        future = self._executor.submit(self._run, item_id)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard)
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Block until every enqueued item has been processed."""
+        with self._lock:
+            pending = list(self._futures)
+        wait(pending, timeout=timeout)
+
+    def _discard(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _run(self, item_id: int) -> None:
+        with self.app.app_context():
+            try:
+                with Session(db.engine) as session:
+                    refresh_item_summary(session, item_id)
+            except Exception:
+                logger.exception("failed to summarize item %s", item_id)
+
+
+def _collect_changed_items(session, flush_context):
+    # History is still available in after_flush, and new rows have their ids.
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Item) and inspect(obj).attrs.description.history.has_changes():
+            pending.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Item):
+            pending.discard(obj.id)
+
+
+def _enqueue_changed_items(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    from flask import current_app
+
+    worker = current_app.extensions.get("summary_worker")
+    if worker is None:
+        return
+    for item_id in sorted(pending):
+        worker.enqueue(item_id)
+
+
+def _discard_changed_items(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_session_hooks() -> None:
+    """Enqueue summaries for items created or edited through `db.session`."""
+    if event.contains(db.session, "after_flush", _collect_changed_items):
+        return
+    event.listen(db.session, "after_flush", _collect_changed_items)
+    event.listen(db.session, "after_commit", _enqueue_changed_items)
+    event.listen(db.session, "after_rollback", _discard_changed_items)
+
+
+def backfill_summaries(session: Session, batch_size: int = 100, concurrency: int = 4) -> dict:
+    """Summarize existing items whose summary is missing or stale.
+
+    Rows are read in id order, `batch_size` at a time; at most `concurrency`
+    summaries are computed at once. Each batch is committed on its own so an
+    interrupted backfill can simply be re-run.
+    """
+    stats = {"scanned": 0, "updated": 0, "skipped": 0, "failed": 0}
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        while True:
+            rows = session.execute(
+                select(Item.id, Item.description, Item.summary_hash)
+                .where(Item.id > last_id)
+                .order_by(Item.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            stats["scanned"] += len(rows)
+
+            stale = []
+            for row in rows:
+                digest = description_hash(row.description)
+                if digest == row.summary_hash:
+                    stats["skipped"] += 1
+                else:
+                    stale.append((row.id, digest, row.description))
+
+            results = pool.map(
+                _summarize, [description for _, _, description in stale], [digest for _, digest, _ in stale]
+            )
+            for (item_id, digest, description), (summary, stored_hash) in zip(stale, results):
+                # items edited while their summary was computed are left to the worker
+                if not _store_summary(session, item_id, description, stored_hash, summary):
+                    stats["skipped"] += 1
+                elif stored_hash != digest:
+                    stats["failed"] += 1
+                else:
+                    stats["updated"] += 1
+            session.commit()
+    return stats
@@ -1,5 +1,8 @@
 from datetime import datetime
 
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DatabaseError
+
 from .extensions import db
 
 
@@ -8,6 +11,11 @@ class Item(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text, nullable=True)
+    # Precomputed summary of `description`, filled in by the background worker
+    # in `app.ml.summaries`. `summary_hash` is the hash of the description the
+    # summary was computed from, so unchanged descriptions are never re-summarized.
+    summary = db.Column(db.Text, nullable=True)
+    summary_hash = db.Column(db.String(64), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
@@ -18,6 +26,70 @@ class Item(db.Model):
             "id": self.id,
             "name": self.name,
             "description": self.description,
+            # None until the background worker has caught up with the description
+            "summary": self.summary,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class ChunkSummary(db.Model):
+    """Summary of one text chunk, shared by every document containing it."""
+
+    __tablename__ = "chunk_summaries"
+    # sha256 of the chunk text
+    hash = db.Column(db.String(64), primary_key=True)
+    summary = db.Column(db.Text, nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    hits = db.Column(db.Integer, default=0, nullable=False)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+def _column_names(engine, table) -> set:
+    return {c["name"] for c in inspect(engine).get_columns(table.name)}
+
+
+def add_missing_columns(engine) -> list:
+    """Add the `Item.summary` / `summary_hash` columns to an existing items table.
+
+    `db.create_all()` only creates missing tables. Every worker runs this at
+    startup, so losing the race to another worker's ALTER is not an error.
+    Returns the "table.column" names that were added.
+    """
+    table = Item.__table__
+    if not inspect(engine).has_table(table.name):
+        return []
+    preparer = engine.dialect.identifier_preparer
+    added = []
+    for column in (table.c.summary, table.c.summary_hash):
+        if column.name in _column_names(engine, table):
+            continue
+        ddl = "ALTER TABLE {} ADD COLUMN {} {}".format(
+            preparer.format_table(table), preparer.format_column(column), column.type.compile(dialect=engine.dialect)
+        )
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(ddl))
+        except DatabaseError:
+            # another worker added it first ("duplicate column")
+            if column.name not in _column_names(engine, table):
+                raise
+            continue
+        added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def create_schema(engine, attempts: int = 3) -> list:
+    """`db.create_all()` plus `add_missing_columns`, safe to run from several workers at once.
+
+    Needs an app context. Returns the columns that were added.
+    """
+    for attempt in range(attempts):
+        try:
+            db.create_all()
+            break
+        except DatabaseError:
+            # another worker created a table between our check and our CREATE TABLE
+            if attempt == attempts - 1:
+                raise
+    return add_missing_columns(engine)
@@ -0,0 +1,237 @@
+"""Opt-in per-request profiling.
+
+Enabled with `PROFILING_ENABLED=1`. A request is then profiled when it
+carries the `PROFILING_HEADER` header equal to `PROFILING_TOKEN` (the header
+is ignored while no token is set) or is picked at random with probability
+`PROFILING_SAMPLE_RATE`.
+
+Two modes (`PROFILING_MODE`):
+
+- `cprofile`: deterministic, writes a pstats `.prof` file (snakeviz,
+  flameprof, `python -m pstats`);
+- `sample`: a background thread samples the request thread's stack every
+  `PROFILING_INTERVAL` seconds and writes collapsed stacks to a `.folded`
+  file (flamegraph.pl, speedscope); much lower overhead.
+
+Files go to `PROFILING_DIR` (default `instance/profiles`), named after the
+route and latency, and every profile is appended to `index.jsonl` there for
+`flask profiles-report`. Only the newest `PROFILING_MAX_FILES` profiles are
+kept. When profiling is disabled no hooks are registered at all. Streamed
+response bodies are generated after the profile ends.
+
+These are Flask request hooks, so the ASGI app only profiles what it passes
+to Flask: its native summarize path (`app.asgi.AsyncMLApp._summarize`) is
+never profiled. Profile summarize under `run.py` instead.
+"""
+import cProfile
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+
+INDEX_FILE = "index.jsonl"
+PROFILE_EXTENSIONS = (".prof", ".folded")
+
+# cProfile can only follow one thread at a time without interference
+_cprofile_lock = threading.Lock()
+
+
+class _Sampler:
+    """Collapsed-stack sampler for one thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def init_profiling(app):
+    if not app.config.get("PROFILING_ENABLED"):
+        return
+    os.makedirs(app.config["PROFILING_DIR"], exist_ok=True)
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abandon_profile)
+
+
+def _wanted(config, request) -> bool:
+    token = config.get("PROFILING_TOKEN")
+    if token and request.headers.get(config["PROFILING_HEADER"]) == token:
+        return True
+    rate = config["PROFILING_SAMPLE_RATE"]
+    return rate > 0 and random.random() < rate
+
+
+def _start_profile():
+    from flask import current_app, g, request
+
+    config = current_app.config
+    if not _wanted(config, request):
+        return None
+
+    if config["PROFILING_MODE"] == "sample":
+        profiler = _Sampler(threading.get_ident(), config["PROFILING_INTERVAL"])
+        profiler.start()
+    else:
+        if not _cprofile_lock.acquire(blocking=False):
+            return None  # another request is being profiled
+        profiler = cProfile.Profile()
+        profiler.enable()
+    g.profiler = (profiler, time.perf_counter())
+    return None
+
+
+def _finish_profile(response):
+    from flask import current_app, g, request
+
+    entry = g.pop("profiler", None)
+    if entry is None:
+        return response
+    profiler, started = entry
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if isinstance(profiler, _Sampler):
+        profiler.stop()
+        ext = "folded"
+    else:
+        profiler.disable()
+        _cprofile_lock.release()
+        ext = "prof"
+
+    route = request.url_rule.rule if request.url_rule else "<unmatched>"
+    directory = current_app.config["PROFILING_DIR"]
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", f"{request.method} {route}").strip("_")
+    name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{slug}-{elapsed_ms:.0f}ms.{ext}"
+    path = os.path.join(directory, name)
+    if ext == "folded":
+        profiler.write(path)
+    else:
+        profiler.dump_stats(path)
+
+    record = {
+        "time": datetime.utcnow().isoformat(),
+        "method": request.method,
+        "route": route,
+        "status": response.status_code,
+        "ms": round(elapsed_ms, 3),
+        "file": name,
+    }
+    with open(os.path.join(directory, INDEX_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    _prune_profiles(directory, current_app.config["PROFILING_MAX_FILES"])
+    response.headers["X-Profile-File"] = name
+    return response
+
+
+def _prune_profiles(directory: str, max_files: int) -> None:
+    """Delete all but the newest `max_files` profiles and drop them from the index."""
+    # names start with a UTC timestamp, so name order is age order
+    names = sorted(n for n in os.listdir(directory) if n.endswith(PROFILE_EXTENSIONS))
+    if len(names) <= max_files:
+        return
+    for name in names[:len(names) - max_files]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass  # pruned by another worker
+
+    index = os.path.join(directory, INDEX_FILE)
+    with open(index, encoding="utf-8") as f:
+        lines = [line for line in f if os.path.exists(os.path.join(directory, json.loads(line)["file"]))]
+    tmp = f"{index}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    os.replace(tmp, index)
+
+
+def _abandon_profile(exc=None):
+    # Only reached with a live profiler if after_request never ran.
+    from flask import g
+
+    entry = g.pop("profiler", None)
+    if entry is None:
+        return
+    profiler = entry[0]
+    if isinstance(profiler, _Sampler):
+        profiler.stop()
+    else:
+        profiler.disable()
+        _cprofile_lock.release()
+
+
+def profile_report(directory: str, top: int = 10, functions: int = 5) -> list:
+    """Aggregate profiles per route, most total time first.
+
+    Each entry has the route, request count and latency stats, and for routes
+    with cProfile data the `functions` most expensive functions by cumulative
+    time across all of that route's profiles.
+    """
+    index = os.path.join(directory, INDEX_FILE)
+    if not os.path.exists(index):
+        return []
+
+    by_route = defaultdict(list)
+    with open(index, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            by_route[f"{record['method']} {record['route']}"].append(record)
+
+    report = []
+    for route, records in by_route.items():
+        latencies = sorted(r["ms"] for r in records)
+        entry = {
+            "route": route,
+            "count": len(records),
+            "total_ms": sum(latencies),
+            "mean_ms": sum(latencies) / len(latencies),
+            "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+            "max_ms": latencies[-1],
+            "functions": [],
+        }
+        prof_files = [
+            os.path.join(directory, r["file"]) for r in records
+            if r["file"].endswith(".prof") and os.path.exists(os.path.join(directory, r["file"]))
+        ]
+        if prof_files and functions:
+            stats = pstats.Stats(*prof_files)
+            rows = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:functions]
+            entry["functions"] = [
+                {"function": pstats.func_std_string(func), "calls": nc, "cumulative_ms": ct * 1000}
+                for func, (cc, nc, tt, ct, callers) in rows
+            ]
+        report.append(entry)
+
+    report.sort(key=lambda e: e["total_ms"], reverse=True)
+    return report[:top]
@@ -13,5 +13,6 @@ except Exception:  # pragma: no cover - import may fail in Streamlit runtime
 bp = Blueprint("health", __name__) if Blueprint else None
 
 
+@bp.route("/health", methods=["GET"])
 def health():
     return jsonify({"status": "ok"}), 200
@@ -1,11 +1,14 @@
 try:
-    from flask import Blueprint, jsonify, request
+    from flask import Blueprint, Response, jsonify, request, stream_with_context
 except Exception:  # pragma: no cover - import may fail in Streamlit runtime
     Blueprint = None  # type: ignore
     def jsonify(x):
         return x
     request = None  # type: ignore
+    Response = None  # type: ignore
+    stream_with_context = None  # type: ignore
 
+from ..export import FORMATS, export_items
 from ..models import Item
 from ..extensions import db
 
@@ -13,11 +16,33 @@ from ..extensions import db
 bp = Blueprint("items", __name__) if Blueprint else None
 
 
+@bp.route("/", methods=["GET"])
 def list_items():
     items = Item.query.all()
     return jsonify([i.to_dict() for i in items]), 200
 
 
+@bp.route("/export", methods=["GET"])
+def export():
+    """Stream every item as NDJSON or CSV (`?format=`, `?gzip=1`, `?after_id=` to resume)."""
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(FORMATS)}"}), 400
+    try:
+        after_id = int(request.args.get("after_id", 0))
+    except ValueError:
+        return jsonify({"error": "after_id must be an integer"}), 400
+    gzip = request.args.get("gzip", "0") in ("1", "true")
+
+    filename = f"items.{fmt}" + (".gz" if gzip else "")
+    return Response(
+        stream_with_context(export_items(db.session, fmt=fmt, gzip=gzip, after_id=after_id)),
+        mimetype="application/gzip" if gzip else FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@bp.route("/", methods=["POST"])
 def create_item():
     data = request.get_json() or {}
     name = data.get("name")
@@ -32,6 +57,7 @@ def create_item():
     return jsonify(item.to_dict()), 201
 
 
+@bp.route("/<int:item_id>", methods=["GET"])
 def get_item(item_id: int):
     item = Item.query.get(item_id)
     if not item:
@@ -39,6 +65,7 @@ def get_item(item_id: int):
     return jsonify(item.to_dict()), 200
 
 
+@bp.route("/<int:item_id>", methods=["DELETE"])
 def delete_item(item_id: int):
     item = Item.query.get(item_id)
     if not item:
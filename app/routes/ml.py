@@ -1,25 +1,77 @@
+import time
+from functools import partial
+
 try:
-    from flask import Blueprint, request, jsonify
+    from flask import Blueprint, current_app, g, request, jsonify
 except Exception:  # pragma: no cover - import may fail in Streamlit runtime
     Blueprint = None  # type: ignore
     def jsonify(x):
         return x
     request = None  # type: ignore
+    current_app = None  # type: ignore
+    g = None  # type: ignore
 
+from ..extensions import db
+from ..ml.admission import Rejected, client_id
+from ..ml.chunk_store import ChunkStore, summarize_document
 from ..ml.integration import summarize_text
 
 
 bp = Blueprint("ml", __name__) if Blueprint else None
 
 
+@bp.before_request
+def admit():
+    """Rate-limit per client and cap summaries in flight (see app.ml.admission)."""
+    admission = current_app.extensions.get("ml_admission")
+    if admission is None:
+        return None
+    try:
+        client = client_id(
+            request.remote_addr, request.headers.get("X-Forwarded-For"), current_app.config["ML_TRUSTED_PROXIES"]
+        )
+        g.ml_slot = (admission.acquire(client), time.monotonic())
+    except Rejected as e:
+        if e.status == 503 and current_app.config["ML_DEGRADE_TO_LOCAL"]:
+            # Overloaded: answer with the local heuristic instead of queueing upstream
+            g.ml_degraded = True
+            return None
+        return jsonify({"error": e.reason}), e.status, {"Retry-After": str(e.retry_after)}
+    return None
+
+
+@bp.teardown_request
+def release_slot(exc=None):
+    slot = g.pop("ml_slot", None)
+    if slot is not None:
+        slot_id, started = slot
+        current_app.extensions["ml_admission"].release(slot_id, time.monotonic() - started)
+
+
+@bp.route("/summarize", methods=["POST"])
 def summarize():
     data = request.get_json() or {}
     text = data.get("text", "")
     if not text:
         return jsonify({"error": "text required"}), 400
 
+    # Degraded requests never go upstream
+    degraded = bool(g.get("ml_degraded"))
+    api_key = False if degraded else None
     try:
-        result = summarize_text(text)
+        if data.get("chunked"):
+            # Long documents: summarize per chunk, reusing stored chunk summaries
+            store = ChunkStore(db.session, max_entries=current_app.config["CHUNK_STORE_MAX_ENTRIES"])
+            slot = g.get("ml_slot")
+            # one upstream call per chunk can outlast the slot TTL; keep the slot alive
+            on_chunk = partial(current_app.extensions["ml_admission"].refresh, slot[0]) if slot else None
+            result, stats = summarize_document(
+                text, store, content_defined=bool(data.get("content_defined")),
+                api_key=api_key, read_only=degraded, on_chunk=on_chunk,
+            )
+            return jsonify({"summary": result, "chunks": stats}), 200
+
+        result = summarize_text(text, api_key=api_key)
         return jsonify({"summary": result}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
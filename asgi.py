@@ -0,0 +1,3 @@
+from app import create_app
+from app.asgi import create_asgi_app
+app = create_asgi_app(create_app())
@@ -1,4 +1,76 @@
-from typing import List, Optional
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+
+class ChunkSpans:
+    """Chunk records for a list of documents, stored as three parallel arrays.
+
+    Chunk `i` is `documents[doc[i]][start[i]:end[i]]`; no chunk text is copied
+    until `text()` / `texts()` is called.
+    """
+
+    __slots__ = ("doc", "start", "end")
+
+    def __init__(self):
+        self.doc = array("q")
+        self.start = array("q")
+        self.end = array("q")
+
+    def __len__(self) -> int:
+        return len(self.doc)
+
+    def __getitem__(self, i: int) -> Tuple[int, int, int]:
+        return self.doc[i], self.start[i], self.end[i]
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        return zip(self.doc, self.start, self.end)
+
+    def append(self, doc: int, start: int, end: int) -> None:
+        self.doc.append(doc)
+        self.start.append(start)
+        self.end.append(end)
+
+    def extend(self, other: "ChunkSpans") -> None:
+        self.doc.extend(other.doc)
+        self.start.extend(other.start)
+        self.end.extend(other.end)
+
+    def text(self, documents: List[str], i: int) -> str:
+        doc, start, end = self[i]
+        return documents[doc][start:end]
+
+    def texts(self, documents: List[str]) -> Iterator[str]:
+        for doc, start, end in self:
+            yield documents[doc][start:end]
+
+
+def _chunk_bounds(text: str, chunk_size: int, chunk_overlap: int) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) offsets into `text` of each chunk `split_text` returns."""
+    if not text:
+        return
+    # split_text works on the stripped text; report offsets into the original.
+    stripped = text.strip()
+    if not stripped:
+        return
+    offset = len(text) - len(text.lstrip())
+    length = len(stripped)
+    start = 0
+    while start < length:
+        end = start + chunk_size
+        yield offset + start, offset + min(end, length)
+        if end >= length:
+            break
+        start = max(0, end - chunk_overlap)
+
+
+def _span_batch(first_doc: int, documents: List[str], chunk_size: int, chunk_overlap: int) -> ChunkSpans:
+    spans = ChunkSpans()
+    for i, text in enumerate(documents, first_doc):
+        for start, end in _chunk_bounds(text, chunk_size, chunk_overlap):
+            spans.append(i, start, end)
+    return spans
 
 
 class RecursiveCharacterTextSplitter:
@@ -9,38 +81,71 @@ class RecursiveCharacterTextSplitter:
     dependencies so Streamlit Cloud can run without installing full langchain.
     """
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, separators: Optional[List[str]] = None):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        separators: Optional[List[str]] = None,
+        parallel_threshold: int = 2_000_000,
+    ):
         self.chunk_size = int(chunk_size)
         self.chunk_overlap = int(chunk_overlap)
         # separators is ignored in this minimal implementation
         self.separators = separators or ["\n\n", "\n", " ", ""]
+        # total characters below which `split_documents(parallel=True)` stays in-process
+        self.parallel_threshold = int(parallel_threshold)
 
     def split_text(self, text: str) -> List[str]:
         if text is None:
             return []
-        text = text.strip()
-        if not text:
-            return []
-
         # Simple sliding-window chunking with overlap
-        chunks: List[str] = []
-        start = 0
-        length = len(text)
-        while start < length:
-            end = start + self.chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            if end >= length:
-                break
-            start = max(0, end - self.chunk_overlap)
-        return chunks
+        return [text[start:end] for start, end in _chunk_bounds(text, self.chunk_size, self.chunk_overlap)]
 
     # Some code expects `split_documents` or `split_texts`; provide a thin wrapper
-    def split_documents(self, documents: List[str]) -> List[str]:
+    def split_documents(self, documents: List[str], parallel: bool = False, max_workers: Optional[int] = None):
+        """Split every document in `documents`.
+
+        By default returns the flat list of chunk strings. With `parallel=True`
+        returns a `ChunkSpans` of (doc index, start, end) records instead,
+        computed in a process pool when the corpus holds at least
+        `parallel_threshold` characters.
+        """
+        if parallel:
+            return self._split_documents_parallel(documents, max_workers)
         out: List[str] = []
         for doc in documents:
             out.extend(self.split_text(doc))
         return out
 
+    def _split_documents_parallel(self, documents: List[str], max_workers: Optional[int]) -> ChunkSpans:
+        documents = list(documents)
+        workers = max_workers or os.cpu_count() or 1
+        total = sum(len(doc) for doc in documents if doc)
+        if workers < 2 or len(documents) < 2 or total < self.parallel_threshold:
+            return _span_batch(0, documents, self.chunk_size, self.chunk_overlap)
+
+        # A few batches per worker, cut on document boundaries at roughly equal size,
+        # so one long document doesn't leave the other workers idle.
+        target = max(1, total // (workers * 4))
+        batches = []
+        first, size = 0, 0
+        for i, doc in enumerate(documents):
+            size += len(doc) if doc else 0
+            if size >= target:
+                batches.append((first, documents[first:i + 1]))
+                first, size = i + 1, 0
+        if first < len(documents):
+            batches.append((first, documents[first:]))
+
+        spans = ChunkSpans()
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+            futures = [
+                pool.submit(_span_batch, start, batch, self.chunk_size, self.chunk_overlap)
+                for start, batch in batches
+            ]
+            for future in futures:
+                spans.extend(future.result())
+        return spans
+
     def split_texts(self, texts: List[str]) -> List[str]:
         return self.split_documents(texts)
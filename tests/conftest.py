@@ -0,0 +1,29 @@
+import pytest
+
+from app import create_app
+
+
+@pytest.fixture(autouse=True)
+def _isolated_state(monkeypatch, tmp_path_factory):
+    # Keep test runs out of the instance/ folder (tracked dev.db, limiter state)
+    # and away from the real OpenAI API; tests that need a key set their own.
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+    monkeypatch.setenv("ML_ADMISSION_DB", str(tmp_path_factory.mktemp("admission") / "ml_admission.db"))
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+
+@pytest.fixture
+def make_app(monkeypatch):
+    """Build an app with extra environment settings, e.g. `make_app(ML_RATE_BURST="2")`."""
+
+    def make(**env):
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        return create_app()
+
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
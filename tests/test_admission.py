@@ -0,0 +1,111 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from app.ml.admission import Admission, client_id
+from app.models import ChunkSummary
+
+
+def test_rate_limit_per_client(make_app):
+    app = make_app(ML_RATE_BURST="2", ML_RATE_PER_SEC="0.5")
+    client = app.test_client()
+    body = {"text": "One. Two. Three."}
+
+    assert client.post("/api/v1/ml/summarize", json=body).status_code == 200
+    assert client.post("/api/v1/ml/summarize", json=body).status_code == 200
+    res = client.post("/api/v1/ml/summarize", json=body)
+    assert res.status_code == 429
+    assert res.headers["Retry-After"] == "2"
+
+    # a spoofed X-Forwarded-For doesn't get a fresh bucket
+    spoofed = {"X-Forwarded-For": "10.0.0.2"}
+    assert client.post("/api/v1/ml/summarize", json=body, headers=spoofed).status_code == 429
+
+    # another peer has its own bucket; other blueprints are not limited
+    other = {"REMOTE_ADDR": "10.0.0.2"}
+    assert client.post("/api/v1/ml/summarize", json=body, environ_base=other).status_code == 200
+    assert client.get("/health").status_code == 200
+
+
+def test_client_id_trusted_proxies():
+    assert client_id("10.0.0.1", "1.2.3.4") == "10.0.0.1"
+    assert client_id("10.0.0.1", "6.6.6.6, 1.2.3.4", trusted_proxies=1) == "1.2.3.4"
+    assert client_id("10.0.0.1", "6.6.6.6, 1.2.3.4, 10.0.0.9", trusted_proxies=2) == "1.2.3.4"
+    # fewer hops than proxies: the header wasn't set by our proxies
+    assert client_id("10.0.0.1", "1.2.3.4", trusted_proxies=2) == "10.0.0.1"
+    assert client_id(None, None) == "unknown"
+
+
+def test_stale_buckets_pruned(tmp_path):
+    admission = Admission(str(tmp_path / "admission.db"), rate=100, burst=1)
+    for n in range(5):
+        admission.take_token(f"client-{n}")
+    time.sleep(0.05)  # every bucket refills within burst / rate = 10ms
+    admission.take_token("client-x")
+    with sqlite3.connect(admission.path) as conn:
+        assert conn.execute("SELECT client FROM buckets").fetchall() == [("client-x",)]
+
+
+@pytest.mark.parametrize("setting", ["ML_RATE_PER_SEC", "ML_RATE_BURST", "ML_MAX_CONCURRENCY"])
+def test_invalid_settings_rejected(make_app, setting):
+    with pytest.raises(ValueError):
+        make_app(**{setting: "0"})
+
+
+def test_waiter_gets_released_slot(tmp_path):
+    admission = Admission(str(tmp_path / "admission.db"), max_concurrency=1, deadline=2, poll_interval=0.01)
+    held = admission.acquire()
+    threading.Timer(0.1, admission.release, (held,)).start()
+    assert admission.acquire() != held
+    with sqlite3.connect(admission.path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM waiters").fetchone()[0] == 0
+
+
+def test_refreshed_slot_outlives_ttl(tmp_path):
+    admission = Admission(str(tmp_path / "admission.db"), max_concurrency=1, deadline=0, slot_ttl=0.3)
+    held = admission.acquire()
+    time.sleep(0.2)
+    admission.refresh(held)  # e.g. a chunked summary finished another chunk
+    time.sleep(0.2)
+    assert admission.try_acquire()[0] is None
+    time.sleep(0.2)
+    assert admission.try_acquire()[0] is not None  # not refreshed again: reaped
+
+
+def test_overload_rejects_or_degrades(make_app, monkeypatch):
+    app = make_app(ML_MAX_CONCURRENCY="1", ML_QUEUE_DEADLINE="0.2")
+    client = app.test_client()
+    admission = app.extensions["ml_admission"]
+    body = {"text": "One. Two. Three."}
+
+    held = admission.acquire()  # the only slot, as if a slow summary were running
+    res = client.post("/api/v1/ml/summarize", json=body)
+    assert res.status_code == 503
+    assert int(res.headers["Retry-After"]) >= 1
+
+    app.config["ML_DEGRADE_TO_LOCAL"] = True
+    monkeypatch.setenv("OPENAI_API_KEY", "would-be-used-if-not-degraded")
+    res = client.post("/api/v1/ml/summarize", json=body)
+    assert res.status_code == 200
+    assert res.get_json()["summary"] == "One. Two."
+
+    # degraded chunked requests neither call upstream nor fill the chunk store
+    res = client.post("/api/v1/ml/summarize", json={**body, "chunked": True})
+    assert res.status_code == 200
+    assert res.get_json()["chunks"]["upstream_calls"] == 0
+    with app.app_context():
+        assert ChunkSummary.query.count() == 0
+
+    admission.release(held)
+    app.config["ML_DEGRADE_TO_LOCAL"] = False
+    assert client.post("/api/v1/ml/summarize", json={"text": "x"}).status_code == 200
+
+
+def test_chunked_request_keeps_its_slot_alive(app, monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(app.extensions["ml_admission"], "refresh", refreshed.append)
+    res = app.test_client().post("/api/v1/ml/summarize", json={"text": "One. Two. " * 300, "chunked": True})
+    assert res.status_code == 200
+    assert len(refreshed) == res.get_json()["chunks"]["local_summaries"] > 1
@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("asgiref")
+
+from app.asgi import create_asgi_app  # noqa: E402
+
+
+def _completion(request):
+    assert request.headers["Authorization"] == "Bearer fake-key-for-test"
+    return httpx.Response(200, json={"choices": [{"message": {"content": " async summary "}}]})
+
+
+def test_summarize_served_on_event_loop(make_app):
+    asgi_app = create_asgi_app(make_app(OPENAI_API_KEY="fake-key-for-test", ML_RATE_BURST="100"))
+    asgi_app.http = httpx.AsyncClient(transport=httpx.MockTransport(_completion))
+
+    async def run():
+        transport = httpx.ASGITransport(app=asgi_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            results = await asyncio.gather(
+                *[client.post("/api/v1/ml/summarize", json={"text": f"text {n}"}) for n in range(20)]
+            )
+            missing = await client.post("/api/v1/ml/summarize", json={})
+            health = await client.get("/health")
+            items = await client.post("/api/v1/items/", json={"name": "via asgi"})
+        return results, missing, health, items
+
+    results, missing, health, items = asyncio.run(run())
+    assert all(r.status_code == 200 and r.json() == {"summary": "async summary"} for r in results)
+    assert missing.status_code == 400
+    # everything else still goes through Flask
+    assert health.json() == {"status": "ok"}
+    assert items.status_code == 201
@@ -0,0 +1,96 @@
+import random
+
+import app.ml.chunk_store as chunk_store
+from app.extensions import db
+from app.models import ChunkSummary
+
+
+def _text(n_words, seed=1):
+    rng = random.Random(seed)
+    words = "alpha beta gamma delta epsilon zeta eta theta iota kappa".split()
+    return " ".join(rng.choice(words) + "." * (rng.random() < 0.1) for _ in range(n_words))
+
+
+def _upstream(calls):
+    def fake(text, api_key=None):
+        calls.append(text)
+        return f"upstream summary {len(calls)}", "openai"
+    return fake
+
+
+def test_reupload_is_served_from_store(app, monkeypatch):
+    client = app.test_client()
+    calls = []
+    monkeypatch.setattr(chunk_store, "summarize_text_with_source", _upstream(calls))
+    text = _text(1500)
+
+    res = client.post("/api/v1/ml/summarize", json={"text": text, "chunked": True})
+    assert res.status_code == 200
+    first = res.get_json()["chunks"]
+    assert first["upstream_calls"] == first["unique_chunks"] == len(calls) > 1
+
+    res = client.post("/api/v1/ml/summarize", json={"text": text, "chunked": True})
+    second = res.get_json()["chunks"]
+    assert second["upstream_calls"] == 0
+    assert second["upstream_calls_saved"] == second["chunks"]
+    assert second["dedup_ratio"] == 1.0
+
+
+def test_local_summaries_are_not_stored(app, monkeypatch):
+    with app.app_context():
+        store = chunk_store.ChunkStore(db.session)
+        _, stats = chunk_store.summarize_document(_text(600), store)
+        assert stats["upstream_calls"] == 0
+        assert stats["local_summaries"] == stats["unique_chunks"]
+        assert ChunkSummary.query.count() == 0
+
+        # read-only (degraded) requests don't store upstream results either
+        monkeypatch.setattr(chunk_store, "summarize_text_with_source", _upstream([]))
+        chunk_store.summarize_document(_text(600), store, read_only=True)
+        assert ChunkSummary.query.count() == 0
+
+
+def test_read_only_leaves_store_untouched(app, monkeypatch):
+    monkeypatch.setattr(chunk_store, "summarize_text_with_source", _upstream([]))
+    text = _text(600)
+    with app.app_context():
+        store = chunk_store.ChunkStore(db.session)
+        chunk_store.summarize_document(text, store)
+        before = {row.hash: (row.hits, row.last_used_at) for row in ChunkSummary.query}
+
+        _, stats = chunk_store.summarize_document(text, store, read_only=True)
+        assert stats["cached_chunks"] == stats["chunks"]
+        assert not db.session.dirty
+        db.session.rollback()  # anything not committed is gone
+        assert {row.hash: (row.hits, row.last_used_at) for row in ChunkSummary.query} == before
+
+
+def test_concurrent_put_of_same_chunk(app):
+    with app.app_context():
+        store = chunk_store.ChunkStore(db.session)
+        store.put("h", "first", 1)
+        store.put("h", "second", 1)  # the other request got there first
+        db.session.commit()
+        assert db.session.get(ChunkSummary, "h").summary == "first"
+
+
+def test_content_defined_bounds_survive_an_edit():
+    text = _text(3000)
+    edited = text[:500] + "INSERTED " + text[500:]
+    before = {chunk_store.chunk_hash(c) for c in chunk_store.split_chunks(text, 400, content_defined=True)}
+    after = chunk_store.split_chunks(edited, 400, content_defined=True)
+    assert "".join(after) == edited
+    # only the chunk(s) around the insertion change
+    assert sum(chunk_store.chunk_hash(c) not in before for c in after) <= 2
+
+
+def test_store_evicts_least_recently_used(app):
+    with app.app_context():
+        store = chunk_store.ChunkStore(db.session, max_entries=3)
+        for n in range(5):
+            store.put(f"h{n}", f"s{n}", 1)
+            db.session.commit()
+        store.get_many(["h0"])
+        assert store.evict() == 2
+        db.session.commit()
+        assert {row.hash for row in ChunkSummary.query} == {"h0", "h3", "h4"}
@@ -0,0 +1,130 @@
+import sqlite3
+
+from sqlalchemy import create_engine, insert, update
+
+import app.ml.summaries as summaries
+import app.models as models
+from app.extensions import db
+from app.models import Item, add_missing_columns
+
+
+def test_summary_filled_on_create_and_edit(app, monkeypatch):
+    client = app.test_client()
+    calls = []
+
+    def fake_summarize(text, api_key=None):
+        calls.append(text)
+        return f"summary of {text}", "openai"
+
+    monkeypatch.setattr(summaries, "summarize_text_with_source", fake_summarize)
+
+    res = client.post("/api/v1/items/", json={"name": "A", "description": "first. second. third."})
+    item_id = res.get_json()["id"]
+    app.extensions["summary_worker"].wait()
+
+    got = client.get(f"/api/v1/items/{item_id}").get_json()
+    assert got["summary"] == "summary of first. second. third."
+    assert len(calls) == 1
+
+    with app.app_context():
+        item = db.session.get(Item, item_id)
+        item.name = "renamed"
+        db.session.commit()
+        assert len(calls) == 1  # description unchanged: nothing enqueued
+
+        item.description = "changed."
+        db.session.commit()
+        assert db.session.get(Item, item_id).summary == "summary of changed."
+    assert len(calls) == 2
+
+
+def test_backfill_skips_up_to_date_rows(app):
+    with app.app_context():
+        db.session.execute(insert(Item), [{"name": f"i{n}", "description": f"text {n}."} for n in range(5)])
+        db.session.execute(insert(Item), [{"name": "empty", "description": None}])
+        db.session.commit()
+
+        stats = summaries.backfill_summaries(db.session, batch_size=2, concurrency=2)
+        assert stats == {"scanned": 6, "updated": 5, "skipped": 1, "failed": 0}
+        assert all(i.summary for i in Item.query.filter(Item.description.isnot(None)))
+
+        stats = summaries.backfill_summaries(db.session, batch_size=2, concurrency=2)
+        assert stats == {"scanned": 6, "updated": 0, "skipped": 6, "failed": 0}
+
+
+def test_failed_upstream_call_is_retried(app, monkeypatch):
+    with app.app_context():
+        db.session.execute(insert(Item), [{"name": "a", "description": "One. Two. Three."}])
+        db.session.commit()
+
+        monkeypatch.setattr(
+            summaries, "summarize_text_with_source", lambda text: (f"(openai-fallback) {text}", "fallback")
+        )
+        stats = summaries.backfill_summaries(db.session)
+        assert stats == {"scanned": 1, "updated": 0, "skipped": 0, "failed": 1}
+        item = db.session.get(Item, 1)
+        assert item.summary is None and item.summary_hash is None
+
+        monkeypatch.setattr(summaries, "summarize_text_with_source", lambda text: ("One.", "openai"))
+        stats = summaries.backfill_summaries(db.session)
+        assert stats == {"scanned": 1, "updated": 1, "skipped": 0, "failed": 0}
+        assert db.session.get(Item, 1).summary == "One."
+
+
+def test_stale_summary_is_dropped(app, monkeypatch):
+    with app.app_context():
+        db.session.execute(insert(Item), [{"name": "a", "description": "old text."}])
+        db.session.commit()
+
+        def edit_while_summarizing(text, api_key=None):
+            # another request edits the item while this summary is computed
+            db.session.execute(update(Item).values(description="new text."))
+            db.session.commit()
+            return f"summary of {text}", "openai"
+
+        monkeypatch.setattr(summaries, "summarize_text_with_source", edit_while_summarizing)
+        assert summaries.refresh_item_summary(db.session, 1) is False
+        item = db.session.get(Item, 1)
+        assert item.summary is None and item.summary_hash is None
+
+
+def test_backfill_command_and_missing_columns(make_app, tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR(120) NOT NULL, description TEXT, "
+        "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+    )
+    conn.execute("INSERT INTO items VALUES (1, 'a', 'One. Two. Three.', '2024-01-01', '2024-01-01')")
+    conn.commit()
+    conn.close()
+
+    app = make_app(DATABASE_URL=f"sqlite:///{path}")  # adds the summary columns to the existing table
+    result = app.test_cli_runner().invoke(args=["backfill-summaries"])
+    assert result.exit_code == 0, result.output
+    assert "1 summarized" in result.output
+    assert app.test_client().get("/api/v1/items/1").get_json()["summary"] == "One. Two."
+
+
+def test_missing_columns_added_once_across_workers(monkeypatch, tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR(120) NOT NULL, description TEXT)")
+    conn.commit()
+    conn.close()
+    engine = create_engine(f"sqlite:///{path}")
+
+    # another worker's ALTER lands between our check and our own ALTER
+    real_column_names = models._column_names
+    checks = []
+
+    def racing_column_names(engine, table):
+        checks.append(table.name)
+        if len(checks) == 1:
+            assert add_missing_columns(engine) == ["items.summary", "items.summary_hash"]
+            return {"id", "name", "description"}
+        return real_column_names(engine, table)
+
+    monkeypatch.setattr(models, "_column_names", racing_column_names)
+    assert add_missing_columns(engine) == []
+    assert {"summary", "summary_hash"} <= real_column_names(engine, Item.__table__)
@@ -0,0 +1,53 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models import Item
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        db.session.execute(insert(Item), [{"name": f"item {n}", "description": f"d,{n}\n"} for n in range(25)])
+        db.session.commit()
+    return app
+
+
+def test_export_ndjson_csv_and_resume(app):
+    client = app.test_client()
+
+    res = client.get("/api/v1/items/export")
+    assert res.status_code == 200
+    assert res.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in res.data.decode().splitlines()]
+    assert [r["id"] for r in rows] == list(range(1, 26))
+    assert rows[0]["description"] == "d,0\n"
+
+    res = client.get("/api/v1/items/export?format=csv&after_id=20")
+    rows = list(csv.DictReader(io.StringIO(res.data.decode())))
+    assert [int(r["id"]) for r in rows] == [21, 22, 23, 24, 25]
+    assert rows[0]["description"] == "d,20\n"
+
+    res = client.get("/api/v1/items/export?format=ndjson&gzip=1")
+    assert res.mimetype == "application/gzip"
+    assert len(gzip.decompress(res.data).splitlines()) == 25
+
+    assert client.get("/api/v1/items/export?format=xml").status_code == 400
+    res = client.get("/api/v1/items/export?after_id=abc")
+    assert res.status_code == 400
+    assert res.get_json() == {"error": "after_id must be an integer"}
+
+
+def test_export_cli(app, tmp_path):
+    out = tmp_path / "items.csv.gz"
+    result = app.test_cli_runner().invoke(
+        args=["export-items", "--format", "csv", "--gzip", "--batch-size", "7", "-o", str(out)]
+    )
+    assert result.exit_code == 0, result.output
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(out.read_bytes()).decode())))
+    assert len(rows) == 25
@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _profiling_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROFILING_DIR", str(tmp_path))
+
+
+def test_disabled_registers_no_hooks(make_app, tmp_path):
+    app = make_app()
+    res = app.test_client().get("/health", headers={"X-Profile": "1"})
+    assert "X-Profile-File" not in res.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_header_triggered_profiles_and_report(make_app, tmp_path):
+    app = make_app(PROFILING_ENABLED="1", PROFILING_TOKEN="secret")
+    client = app.test_client()
+
+    assert "X-Profile-File" not in client.get("/health", headers={"X-Profile": "wrong"}).headers
+    for _ in range(3):
+        res = client.get("/api/v1/items/", headers={"X-Profile": "secret"})
+        assert res.headers["X-Profile-File"].endswith(".prof")
+    client.get("/health", headers={"X-Profile": "secret"})
+
+    index = [json.loads(line) for line in (tmp_path / "index.jsonl").read_text().splitlines()]
+    assert [r["route"] for r in index] == ["/api/v1/items/"] * 3 + ["/health"]
+    assert all((tmp_path / r["file"]).exists() for r in index)
+
+    result = app.test_cli_runner().invoke(args=["profiles-report", "--top", "1"])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith("GET /api/v1/items/: 3 requests")
+    assert "list_items" in result.output
+
+
+def test_sampling_mode_writes_collapsed_stacks(make_app, tmp_path):
+    app = make_app(
+        PROFILING_ENABLED="1", PROFILING_MODE="sample",
+        PROFILING_SAMPLE_RATE="1", PROFILING_INTERVAL="0.0005",
+    )
+    res = app.test_client().get("/api/v1/items/")
+    name = res.headers["X-Profile-File"]
+    assert name.endswith(".folded")
+    for line in (tmp_path / name).read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and ";" in stack
+
+
+def test_header_ignored_without_token(make_app, monkeypatch, tmp_path):
+    monkeypatch.delenv("PROFILING_TOKEN", raising=False)
+    app = make_app(PROFILING_ENABLED="1")
+    res = app.test_client().get("/health", headers={"X-Profile": "1"})
+    assert "X-Profile-File" not in res.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_only_newest_profiles_are_kept(make_app, tmp_path):
+    app = make_app(PROFILING_ENABLED="1", PROFILING_SAMPLE_RATE="1", PROFILING_MAX_FILES="2")
+    client = app.test_client()
+    names = [client.get("/health").headers["X-Profile-File"] for _ in range(4)]
+
+    assert sorted(n for n in os.listdir(tmp_path) if n != "index.jsonl") == names[2:]
+    index = [json.loads(line) for line in (tmp_path / "index.jsonl").read_text().splitlines()]
+    assert [r["file"] for r in index] == names[2:]
@@ -0,0 +1,32 @@
+from langchain.text_splitter import ChunkSpans, RecursiveCharacterTextSplitter
+
+
+DOCS = [
+    "  leading and trailing whitespace is stripped before chunking.  ",
+    "",
+    "short",
+    "x" * 95,
+    "\n\n" + "abcdefghij" * 7 + "\n",
+]
+
+
+def test_spans_match_split_documents():
+    splitter = RecursiveCharacterTextSplitter(chunk_size=20, chunk_overlap=5)
+    spans = splitter.split_documents(DOCS, parallel=True)
+    assert isinstance(spans, ChunkSpans)
+    assert list(spans.texts(DOCS)) == splitter.split_documents(DOCS)
+    # every record points back at the document it came from
+    for i, (doc, start, end) in enumerate(spans):
+        assert splitter.split_text(DOCS[doc])
+        assert spans.text(DOCS, i) == DOCS[doc][start:end]
+
+
+def test_process_pool_matches_in_process():
+    docs = [f"document {n} " * (n % 17 + 1) for n in range(200)]
+    in_process = RecursiveCharacterTextSplitter(chunk_size=30, chunk_overlap=10)
+    pooled = RecursiveCharacterTextSplitter(chunk_size=30, chunk_overlap=10, parallel_threshold=0)
+
+    expected = in_process.split_documents(docs, parallel=True)
+    got = pooled.split_documents(docs, parallel=True, max_workers=2)
+    assert list(got) == list(expected)
+    assert list(got.texts(docs)) == in_process.split_documents(docs)
@@ -0,0 +1,161 @@
+"""Compare concurrent summarize capacity of the sync and ASGI serving paths.
+
+Usage:
+  pip install -r backend-requirements.txt
+  python tools/bench_async.py [--concurrency 200,1000] [--workers 2] [--upstream-latency 2.0]
+
+For each serving mode this script starts gunicorn on a free local port,
+pointed at `tools/fake_openai.py`:
+  - sync: `gunicorn -w N run:app` (one blocking request per process)
+  - asgi: `gunicorn -w N -k uvicorn.workers.UvicornWorker asgi:app`
+then fires `--concurrency` summarize requests at once and reports how many
+upstream calls were in flight at the same time, total wall time, and the
+server's resident memory per in-flight request (RSS of the gunicorn process
+tree at peak minus idle, divided by peak in-flight upstream calls).
+Runs fully offline. Linux only (reads /proc for memory).
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "tools"))
+
+from fake_openai import FakeOpenAIServer  # noqa: E402
+from loadtest import free_port, wait_for_http  # noqa: E402
+
+MODES = {
+    "sync": ["run:app"],
+    "asgi": ["--worker-class", "uvicorn.workers.UvicornWorker", "asgi:app"],
+}
+
+
+def tree_rss_kib(pid: int) -> int:
+    """Resident memory of `pid` and its direct children, in KiB."""
+    pids = [pid]
+    try:
+        children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+        pids += [int(c) for c in children]
+    except OSError:
+        pass
+    total = 0
+    for p in pids:
+        try:
+            for line in Path(f"/proc/{p}/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1])
+        except OSError:
+            pass
+    return total
+
+
+async def fire(base_url: str, concurrency: int):
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=0)
+    async with httpx.AsyncClient(base_url=base_url, timeout=600, limits=limits) as client:
+
+        async def one(n):
+            try:
+                r = await client.post("/api/v1/ml/summarize", json={"text": f"Benchmark request {n}. It is short."})
+                return r.status_code == 200
+            except Exception:
+                return False
+
+        return await asyncio.gather(*[one(n) for n in range(concurrency)])
+
+
+def run_mode(mode, workers, concurrency, upstream, env):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    cmd = [
+        sys.executable, "-m", "gunicorn",
+        "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers),
+        "--backlog", "4096",
+        "--timeout", "600",
+        "--log-level", "warning",
+    ] + MODES[mode]
+    proc = subprocess.Popen(cmd, cwd=str(REPO_ROOT), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        if not wait_for_http(base_url + "/health"):
+            proc.terminate()
+            print(f"{mode}: server did not start: {proc.communicate(timeout=10)[1].decode(errors='replace')[-2000:]}")
+            return
+        # one warm-up call so lazily created clients/imports are not counted
+        asyncio.run(fire(base_url, 1))
+        idle = tree_rss_kib(proc.pid)
+
+        upstream.max_in_flight = 0
+        peak = [idle]
+        done = threading.Event()
+
+        def sample():
+            while not done.is_set():
+                peak[0] = max(peak[0], tree_rss_kib(proc.pid))
+                time.sleep(0.05)
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        t0 = time.perf_counter()
+        results = asyncio.run(fire(base_url, concurrency))
+        elapsed = time.perf_counter() - t0
+        done.set()
+        sampler.join()
+
+        in_flight = upstream.max_in_flight
+        per_request = (peak[0] - idle) / in_flight if in_flight else 0.0
+        print(
+            f"{mode:<6} {workers:>7} {concurrency:>11} {sum(results):>6} {in_flight:>14} "
+            f"{elapsed:>8.1f}s {idle / 1024:>9.1f} {peak[0] / 1024:>9.1f} {per_request:>12.1f}"
+        )
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent summarize capacity: sync vs ASGI")
+    parser.add_argument("--modes", default="sync,asgi")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", default="200,1000", help="comma-separated concurrent request counts")
+    parser.add_argument("--upstream-latency", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    upstream = FakeOpenAIServer(latency=args.upstream_latency, jitter=0.0).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        # measure the server, not the rate limiter; export ML_ADMISSION_ENABLED=1 to include it
+        env.setdefault("ML_ADMISSION_ENABLED", "0")
+        env.update(
+            {
+                "OPENAI_API_KEY": "fake-key-for-bench",
+                "OPENAI_API_BASE": upstream.api_base,
+                "DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+            }
+        )
+        subprocess.run(
+            [sys.executable, "-c", "from app import create_app; create_app()"], cwd=str(REPO_ROOT), env=env, check=True
+        )
+        print(
+            f"{'mode':<6} {'workers':>7} {'concurrency':>11} {'ok':>6} {'peak upstream':>14} "
+            f"{'wall':>9} {'idle MiB':>9} {'peak MiB':>9} {'KiB/in-flight':>12}"
+        )
+        for mode in args.modes.split(","):
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                run_mode(mode, args.workers, concurrency, upstream, env)
+    upstream.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Local stand-in for the OpenAI Chat Completions API.
+
+Usage:
+  python tools/fake_openai.py [--port 8099] [--latency 0.5] [--jitter 0.1] [--error-rate 0.0]
+
+Then point the app at it (no network access or real key needed):
+  OPENAI_API_KEY=fake OPENAI_API_BASE=http://127.0.0.1:8099/v1 gunicorn run:app
+
+Every POST to `/v1/chat/completions` sleeps for `latency` +/- `jitter`
+seconds, then either fails with a 500 (with probability `error_rate`) or
+returns a completion shaped like the real API's. Used by `tools/loadtest.py`.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # load tests open many connections at once
+
+    def __init__(self, address=("127.0.0.1", 0), latency=0.5, jitter=0.1, error_rate=0.0):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def api_base(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        """Serve from a daemon thread; returns self."""
+        threading.Thread(target=self.serve_forever, name="fake-openai", daemon=True).start()
+        return self
+
+    def delay(self) -> float:
+        return max(0.0, random.uniform(self.latency - self.jitter, self.latency + self.jitter))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server._lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay())
+        finally:
+            with server._lock:
+                server.in_flight -= 1
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            return self._send(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+        if random.random() < server.error_rate:
+            return self._send(500, {"error": {"message": "injected failure", "type": "server_error"}})
+
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        text = prompt.split("\n\n", 1)[-1]
+        self._send(
+            200,
+            {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": f"(fake) {text[:120]}"},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            },
+        )
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):  # keep load test output readable
+        pass
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fake OpenAI Chat Completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.5, help="mean response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="uniform +/- jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 500")
+    args = parser.parse_args(argv)
+
+    server = FakeOpenAIServer((args.host, args.port), args.latency, args.jitter, args.error_rate)
+    print(f"Fake OpenAI listening on {server.api_base}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""Offline load test for choosing gunicorn worker settings.
+
+Usage:
+  pip install -r backend-requirements.txt   (gevent is optional)
+  python tools/loadtest.py [--worker-classes sync,gthread,gevent] [--workers 1,2,4]
+                           [--concurrency 32] [--duration 20]
+                           [--mix list=4,get=4,create=1,summarize=1]
+                           [--upstream-latency 0.8] [--upstream-error-rate 0.02]
+
+For every worker class / worker count combination this script:
+  - starts `gunicorn run:app` on a free local port, backed by a throwaway
+    SQLite database and pointed at `tools/fake_openai.py` instead of OpenAI
+  - replays the configured mix of items CRUD and summarize requests from
+    `--concurrency` client threads for `--duration` seconds
+  - prints throughput, error count and p50/p95/p99 latency per route
+
+Nothing leaves the machine. Worker classes whose dependencies aren't
+installed (e.g. gevent) are skipped.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "tools"))
+
+from fake_openai import FakeOpenAIServer  # noqa: E402
+
+# route name -> (method, path, json body); "{id}" is replaced with a known item id
+ROUTES = {
+    "list": ("GET", "/api/v1/items/", None),
+    "get": ("GET", "/api/v1/items/{id}", None),
+    "create": ("POST", "/api/v1/items/", {"name": "load test", "description": "Created. By the load test."}),
+    "summarize": (
+        "POST",
+        "/api/v1/ml/summarize",
+        {"text": "The load test sends this text. It has a few sentences. Each one is short. That is fine."},
+    ),
+}
+
+# extra packages a worker class needs
+WORKER_CLASS_DEPS = {"gevent": "gevent", "eventlet": "eventlet", "tornado": "tornado"}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_http(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urlopen(url, timeout=3) as r:
+                if r.status == 200:
+                    return True
+        except Exception:
+            time.sleep(0.2)
+    return False
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ROUTES:
+            raise SystemExit(f"unknown route {name!r} in --mix (choose from {', '.join(ROUTES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def call(base_url, route, item_id):
+    method, path, body = ROUTES[route]
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = Request(base_url + path.format(id=item_id), data=data, method=method)
+    if data is not None:
+        req.add_header("Content-Type", "application/json")
+    try:
+        with urlopen(req, timeout=60) as r:
+            payload = r.read()
+            ok = r.status < 400
+    except HTTPError as e:
+        e.read()
+        return False, None
+    except Exception:
+        return False, None
+    if route == "create" and ok:
+        return ok, json.loads(payload)["id"]
+    return ok, None
+
+
+def run_load(base_url, mix, concurrency, duration, seed_item_id):
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    results = {name: {"latencies": [], "errors": 0} for name in names}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(n):
+        rng = random.Random(n)
+        item_id = seed_item_id
+        while time.perf_counter() < deadline:
+            route = rng.choices(names, weights)[0]
+            t0 = time.perf_counter()
+            ok, new_id = call(base_url, route, item_id)
+            elapsed = time.perf_counter() - t0
+            item_id = new_id or item_id
+            with lock:
+                if ok:
+                    results[route]["latencies"].append(elapsed)
+                else:
+                    results[route]["errors"] += 1
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, time.perf_counter() - started
+
+
+def start_gunicorn(worker_class, workers, threads, port, env):
+    cmd = [
+        sys.executable, "-m", "gunicorn",
+        "--bind", f"127.0.0.1:{port}",
+        "--worker-class", worker_class,
+        "--workers", str(workers),
+        "--timeout", "120",
+        "--log-level", "warning",
+    ]
+    if worker_class == "gthread":
+        cmd += ["--threads", str(threads)]
+    if worker_class in ("gevent", "eventlet"):
+        cmd += ["--worker-connections", "1000"]
+    cmd.append("run:app")
+    return subprocess.Popen(cmd, cwd=str(REPO_ROOT), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def benchmark(worker_class, workers, args, env):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    proc = start_gunicorn(worker_class, workers, args.threads, port, env)
+    try:
+        if not wait_for_http(base_url + "/health"):
+            proc.terminate()
+            print(f"  gunicorn did not start: {proc.communicate(timeout=10)[1].decode(errors='replace')[-2000:]}")
+            return None
+        ok, item_id = call(base_url, "create", None)
+        if not ok:
+            print("  could not create the seed item")
+            return None
+        return run_load(base_url, args.mix, args.concurrency, args.duration, item_id)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def report(label, results, elapsed):
+    rows = []
+    for route, r in results.items():
+        lat = sorted(r["latencies"])
+        rows.append(
+            {
+                "config": label,
+                "route": route,
+                "requests": len(lat),
+                "errors": r["errors"],
+                "rps": len(lat) / elapsed,
+                "p50_ms": percentile(lat, 50) * 1000,
+                "p95_ms": percentile(lat, 95) * 1000,
+                "p99_ms": percentile(lat, 99) * 1000,
+            }
+        )
+    for row in rows:
+        print(
+            f"{row['config']:<14} {row['route']:<10} {row['requests']:>8} {row['errors']:>7} {row['rps']:>9.1f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}"
+        )
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Sweep gunicorn worker settings against a fake OpenAI upstream")
+    parser.add_argument("--worker-classes", default="sync,gthread,gevent")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker process counts")
+    parser.add_argument("--threads", type=int, default=8, help="threads per gthread worker")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent client threads")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load per configuration")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("list=4,get=4,create=1,summarize=1"))
+    parser.add_argument("--upstream-latency", type=float, default=0.8)
+    parser.add_argument("--upstream-jitter", type=float, default=0.2)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="also write all result rows to this file")
+    args = parser.parse_args(argv)
+
+    if importlib.util.find_spec("gunicorn") is None:
+        print("gunicorn is not installed; run `pip install -r backend-requirements.txt`.")
+        return 2
+
+    upstream = FakeOpenAIServer(
+        latency=args.upstream_latency, jitter=args.upstream_jitter, error_rate=args.upstream_error_rate
+    ).start()
+    print(f"Fake OpenAI at {upstream.api_base}")
+
+    all_rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        # measure the server, not the rate limiter; export ML_ADMISSION_ENABLED=1 to include it
+        env.setdefault("ML_ADMISSION_ENABLED", "0")
+        env.update(
+            {
+                "OPENAI_API_KEY": "fake-key-for-loadtest",
+                "OPENAI_API_BASE": upstream.api_base,
+                "PYTHONUNBUFFERED": "1",
+            }
+        )
+        print(
+            f"{'config':<14} {'route':<10} {'requests':>8} {'errors':>7} {'req/s':>9} "
+            f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        for worker_class in args.worker_classes.split(","):
+            dep = WORKER_CLASS_DEPS.get(worker_class)
+            if dep and importlib.util.find_spec(dep) is None:
+                print(f"{worker_class:<14} skipped ({dep} is not installed)")
+                continue
+            for workers in (int(w) for w in args.workers.split(",")):
+                # fresh database per run; create the tables once up front so
+                # workers don't race each other in db.create_all()
+                env["DATABASE_URL"] = f"sqlite:///{tmp}/{worker_class}-{workers}.db"
+                subprocess.run(
+                    [sys.executable, "-c", "from app import create_app; create_app()"],
+                    cwd=str(REPO_ROOT), env=env, check=True,
+                )
+                label = f"{worker_class}x{workers}"
+                result = benchmark(worker_class, workers, args, env)
+                if result is None:
+                    continue
+                all_rows.extend(report(label, *result))
+
+    upstream.shutdown()
+    print(f"Fake OpenAI served {upstream.requests} completions")
+    if args.json:
+        Path(args.json).write_text(json.dumps(all_rows, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())